@@ -1,108 +1,666 @@
 #!/usr/bin/env python3
-import requests
-from bs4 import BeautifulSoup
-import html2markdown
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+import html
+import logging
 import os
 import re
+import sys
+import time
 import argparse
-from urllib.parse import urlparse, urljoin
+from urllib.parse import parse_qsl, urlencode, urlparse, urljoin
+
+# Progress messages are logged with lazy %-style formatting
+logger = logging.getLogger("scraper")
+logger.setLevel(logging.INFO)
+_LOG_HANDLER = logging.StreamHandler(sys.stdout)
+_LOG_HANDLER.setFormatter(logging.Formatter("%(message)s"))
+logger.addHandler(_LOG_HANDLER)
+logger.propagate = False
+
+# Default upper bound on lesson pages downloaded from one host at the same time
+DEFAULT_MAX_PER_HOST = 8
+
+# Attempts made after a 429 Too Many Requests, and the first backoff delay in seconds
+# when the server does not send Retry-After (doubled on every attempt)
+MAX_RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 1.0
+# Longest single wait after a 429, however large a Retry-After the server sends
+MAX_RATE_LIMIT_DELAY = 60.0
+
+# Lessons handed to each conversion worker per round trip
+CONVERT_CHUNK_SIZE = 8
+
+# Pages announcing a larger Content-Length are skipped without downloading the body
+MAX_PAGE_BYTES = 5_000_000
+
+# hrefs that never point at a lesson page, and those that carry their own host
+_NON_PAGE_HREF_PREFIXES = ("mailto:", "javascript:", "tel:")
+_ABSOLUTE_HREF_PREFIXES = ("http://", "https://", "//")
+
+# Characters stripped from saved filenames, and those replaced in filename slugs
+_FILENAME_STRIP_RE = re.compile(r'[\/*?:"<>|]')
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9_-]")
+
+# Flags for creating or replacing a saved lesson file (O_BINARY keeps Windows from translating newlines)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+# requests, bs4, lxml and markdownify are only imported on first use, so `--help`
+# and early exits skip loading them. The objects built from them are cached here.
+_SESSION = None
+_MARKDOWN_CONVERTER = None
+_LESSON_STRAINER = None
+_LINK_XPATHS = None
+
+# Titles are read straight from the raw bytes, which only need the document head
+_TITLE_RE = re.compile(rb"<title[^>]*>(.*?)</title>", re.DOTALL | re.IGNORECASE)
+TITLE_SEARCH_BYTES = 16384
+
+# Start-page link extraction runs as precompiled XPath queries in lxml's C code
+_SIDEBAR_DIV_XPATH = (
+    '//div[contains(concat(" ", normalize-space(@class), " "), " sidebar_CUen ")]'
+)
+_SIDEBAR_NAV_XPATH = '//nav[@aria-label="Docs sidebar"]'
+_ANCHOR_XPATH = ".//a[@href]"
+
+
+def get_session():
+    """
+    Returns the shared session, building it on first use. Every fetch reuses its
+    pooled keep-alive connections, and responses are cached on disk and
+    revalidated with ETag/Last-Modified, so reruns skip unchanged pages.
+    The first call happens when fetching the starting page, before any threads start.
+    """
+    global _SESSION
+    if _SESSION is None:
+        from requests.adapters import HTTPAdapter
+        from requests_cache import CachedSession
+        from urllib3.util.retry import Retry
+
+        session = CachedSession(
+            "scrape_cache.sqlite",
+            cache_control=True,
+            expire_after=3600,
+            stale_if_error=True,
+            # Saving reads the whole body, so pages fetch_page would skip must never be cached
+            filter_fn=is_cacheable_page,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=32,
+            # 429s are left to fetch_lesson, which pauses the whole host instead of one thread
+            max_retries=Retry(
+                total=3, backoff_factor=0.3, respect_retry_after_header=False
+            ),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        try:
+            import brotli  # noqa: F401  (urllib3 can only decode "br" when this is installed)
+
+            session.headers["Accept-Encoding"] = "gzip, deflate, br"
+        except ImportError:
+            session.headers["Accept-Encoding"] = "gzip, deflate"
+        _SESSION = session
+    return _SESSION
+
+
+def get_link_xpaths():
+    """
+    Returns the (sidebar div, sidebar nav, anchor) XPath queries, compiling them
+    on first use.
+    """
+    global _LINK_XPATHS
+    if _LINK_XPATHS is None:
+        from lxml import etree
+
+        _LINK_XPATHS = (
+            etree.XPath(_SIDEBAR_DIV_XPATH),
+            etree.XPath(_SIDEBAR_NAV_XPATH),
+            etree.XPath(_ANCHOR_XPATH),
+        )
+    return _LINK_XPATHS
+
+
+def get_lesson_strainer():
+    """
+    Returns the SoupStrainer used for lesson pages, built on first use. Lesson
+    pages are only parsed for their <article>; everything else is skipped.
+    """
+    global _LESSON_STRAINER
+    if _LESSON_STRAINER is None:
+        from bs4 import SoupStrainer
+
+        _LESSON_STRAINER = SoupStrainer("article")
+    return _LESSON_STRAINER
+
+
+def get_markdown_converter():
+    """Returns the MarkdownConverter, built once on first use and reused for every page."""
+    global _MARKDOWN_CONVERTER
+    if _MARKDOWN_CONVERTER is None:
+        from markdownify import ATX, MarkdownConverter
 
+        # bs4_options only matters for convert(str); pages go through convert_soup
+        _MARKDOWN_CONVERTER = MarkdownConverter(heading_style=ATX, bs4_options="lxml")
+    return _MARKDOWN_CONVERTER
 
-def fetch_url(url):
-    """Fetches the content of a URL and returns a BeautifulSoup object."""
+
+class RateLimitedError(Exception):
+    """Raised by fetch_page when the server answers 429 Too Many Requests."""
+
+    def __init__(self, url, retry_after=None):
+        super().__init__(f"Rate limited while fetching {url}")
+        self.retry_after = retry_after  # Seconds to wait, or None if not given
+
+
+class HostLimiter:
+    """
+    Politeness limits for one host: at most max_concurrent requests in flight, and
+    request starts spaced at least 1/rate seconds apart (no spacing if rate is 0).
+    """
+
+    def __init__(self, max_concurrent, rate=0):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.interval = 1 / rate if rate else 0
+        self.next_start = 0.0
+
+    async def wait_turn(self):
+        """Sleeps until this host may start another request, and books that slot."""
+        now = asyncio.get_running_loop().time()
+        start = max(now, self.next_start)
+        self.next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def pause(self, seconds):
+        """Holds back every further request to this host for the given number of seconds."""
+        now = asyncio.get_running_loop().time()
+        self.next_start = max(self.next_start, now + seconds)
+
+
+def parse_retry_after(value):
+    """Converts a Retry-After header (seconds or an HTTP date) to seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        return BeautifulSoup(response.content, "html.parser")
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limit_delay(error, attempt):
+    """Seconds to wait after a RateLimitedError on the given attempt (0-based), capped."""
+    delay = error.retry_after
+    if delay is None:
+        delay = RATE_LIMIT_BACKOFF * 2**attempt
+    return min(delay, MAX_RATE_LIMIT_DELAY)
+
+
+def parse_content_length(value):
+    """
+    Parses a Content-Length header into bytes, or None when it is missing or
+    unparsable. A repeated header arrives joined as "84, 84"; the first value is used.
+    """
+    try:
+        return int(value.split(",")[0])
+    except (AttributeError, ValueError):
+        return None
+
+
+def page_rejection_reason(headers):
+    """
+    Returns why a response with these headers should not be downloaded, or None.
+    A missing Content-Type is accepted, since some servers omit it for HTML.
+    """
+    content_type = headers.get("Content-Type", "")
+    if content_type and "html" not in content_type.lower():
+        return f"not an HTML page ({content_type})"
+    # An unknown length is accepted; the size is only checked when declared
+    content_length = parse_content_length(headers.get("Content-Length"))
+    if content_length is not None and content_length > MAX_PAGE_BYTES:
+        return f"larger than {MAX_PAGE_BYTES} bytes"
+    return None
+
+
+def is_cacheable_page(response):
+    """filter_fn for the HTTP cache: only responses fetch_page would keep are stored."""
+    return page_rejection_reason(response.headers) is None
+
+
+def make_soup(content, parse_only=None):
+    """
+    Parses HTML bytes into a BeautifulSoup object using lxml.
+    parse_only is an optional SoupStrainer limiting which tags are kept.
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(content, "lxml", parse_only=parse_only)
+
+
+def fetch_page(url):
+    """
+    Fetches the content of a URL and returns the raw response bytes.
+    The body is only downloaded once the headers show an HTML page of a sane size.
+    Raises RateLimitedError on 429 so the caller can back off and retry.
+    """
+    import requests
+
+    try:
+        # Split timeouts: fail fast when connecting, allow slower reads
+        with get_session().get(url, timeout=(3, 10), stream=True) as response:
+            if response.status_code == 429:
+                raise RateLimitedError(
+                    url, parse_retry_after(response.headers.get("Retry-After"))
+                )
+            response.raise_for_status()  # Raise an exception for bad status codes
+            rejection = page_rejection_reason(response.headers)
+            if rejection:
+                logger.warning("Skipping %s: %s", url, rejection)
+                return None
+            return response.content
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching {url}: {e}")
+        logger.error("Error fetching %s: %s", url, e)
+        return None
+
+
+def fetch_tree(url):
+    """
+    Fetches the content of a URL and returns its lxml HTML tree.
+    A 429 is retried with the same capped backoff as lesson fetches.
+    """
+    import lxml.html
+    from bs4.dammit import UnicodeDammit
+    from lxml import etree
+
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            content = fetch_page(url)
+            break
+        except RateLimitedError as e:
+            if attempt == MAX_RATE_LIMIT_RETRIES:
+                logger.error("Giving up on %s after repeated 429 responses", url)
+                return None
+            delay = rate_limit_delay(e, attempt)
+            logger.warning("  Rate limited on %s, retrying in %.1fs", url, delay)
+            time.sleep(delay)
+    if content is None:
+        return None
+    # libxml2 falls back to Latin-1 without a <meta charset>, mangling non-ASCII
+    # hrefs; detect the encoding the way bs4 does and hand it to the parser
+    encoding = UnicodeDammit(content, is_html=True).original_encoding
+    try:
+        return lxml.html.fromstring(
+            content, parser=lxml.html.HTMLParser(encoding=encoding)
+        )
+    except etree.ParserError as e:
+        logger.error("Error parsing %s: %s", url, e)
         return None
 
 
-def extract_lesson_links(soup, current_page_url, docs_base_url):
+@dataclass(slots=True)
+class Lesson:
+    """A lesson page as it moves through the fetch, convert and save stages."""
+
+    url: str
+    fetched: bool = False
+    content: bytes | None = None  # Raw HTML, dropped once converted
+    title: str = ""
+    duplicate: bool = False  # An earlier lesson has the same title
+    markdown: str | None = None  # None when no content element was found
+
+
+async def fetch_lesson(lesson, limiter, executor):
     """
-    Extracts lesson links from the main documentation page.
-    Uses current_page_url to resolve relative links and docs_base_url to filter.
+    Runs fetch_page in a worker thread within the host's limits. On 429 the whole
+    host is paused for Retry-After, or an exponential backoff, before retrying.
+    Any other unexpected error is logged and the lesson counted as failed.
     """
-    links = []
+    loop = asyncio.get_running_loop()
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        async with limiter.semaphore:
+            await limiter.wait_turn()
+            try:
+                lesson.content = await loop.run_in_executor(
+                    executor, fetch_page, lesson.url
+                )
+                break
+            except RateLimitedError as e:
+                # No pause on the last attempt: nothing will retry, so other
+                # requests to the host should not wait on it
+                if attempt < MAX_RATE_LIMIT_RETRIES:
+                    delay = rate_limit_delay(e, attempt)
+                    limiter.pause(delay)
+                    logger.warning(
+                        "  Rate limited on %s, retrying in %.1fs", lesson.url, delay
+                    )
+            except Exception:
+                # One bad page must not abort the whole batch through gather
+                logger.exception("Unexpected error fetching %s", lesson.url)
+                break
+    else:
+        logger.error("Giving up on %s after repeated 429 responses", lesson.url)
+    lesson.fetched = lesson.content is not None
+    if lesson.fetched:
+        lesson.title = get_lesson_title(lesson.content, lesson.url)
+
+
+async def fetch_lessons(lessons, max_per_host, rate):
+    """
+    Fetch stage: downloads all lessons concurrently, filling in lesson.content.
+    Each host gets its own HostLimiter, so one slow or strict origin cannot
+    starve the others.
+    """
+    hosts = {urlparse(lesson.url).netloc for lesson in lessons}
+    limiters = {host: HostLimiter(max_per_host, rate) for host in hosts}
+    # Dedicated threads, so the default executor's size never caps concurrency
+    with ThreadPoolExecutor(max_workers=max_per_host * max(len(hosts), 1)) as executor:
+        await asyncio.gather(
+            *(
+                fetch_lesson(lesson, limiters[urlparse(lesson.url).netloc], executor)
+                for lesson in lessons
+            )
+        )
+
+
+def mark_duplicate_lessons(lessons):
+    """
+    Title stage: flags fetched lessons whose title was already used by an earlier
+    lesson, so duplicates are not parsed unless the earlier lesson turns out to
+    have no content (see convert_lessons).
+    """
+    # URLs are canonicalized before fetching; titles still catch pages served under different URLs
+    seen_titles = set()
+    for lesson in lessons:
+        if not lesson.fetched:
+            continue
+        if lesson.title in seen_titles:
+            lesson.duplicate = True
+        else:
+            seen_titles.add(lesson.title)
+
+
+def convert_lessons(lessons):
+    """
+    Convert stage: parses the fetched, non-duplicate lessons and converts them to
+    Markdown in a process pool, filling in lesson.markdown.
+    A title only counts as taken once a lesson produces non-empty Markdown for it.
+    When the first lesson with a title has none, the next duplicate with that
+    title is converted in a follow-up round instead.
+    """
+    waiting = {}  # Title -> duplicates still held back, in order
+    for lesson in lessons:
+        if lesson.duplicate:
+            waiting.setdefault(lesson.title, []).append(lesson)
+
+    pending = [
+        lesson
+        for lesson in lessons
+        if lesson.content is not None and not lesson.duplicate
+    ]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        while pending:
+            results = executor.map(
+                convert_and_extract,
+                [lesson.content for lesson in pending],
+                chunksize=CONVERT_CHUNK_SIZE,
+            )
+            retry = []
+            for lesson, markdown_content in zip(pending, results):
+                lesson.markdown = markdown_content
+                lesson.content = None
+                has_markdown = bool(markdown_content and markdown_content.strip())
+                if not has_markdown and waiting.get(lesson.title):
+                    next_lesson = waiting[lesson.title].pop(0)
+                    next_lesson.duplicate = False
+                    retry.append(next_lesson)
+            pending = retry
+
+    # Whatever is still waiting is a real duplicate and never needs its content
+    for duplicates in waiting.values():
+        for lesson in duplicates:
+            lesson.content = None
+
+
+def save_lessons(lessons, output_dir):
+    """
+    Save stage: skips failed, duplicate and empty lessons, and writes the rest in
+    order with numbered filenames. Returns the number of lessons saved.
+    Files are written directly rather than through a queued writer task: this
+    stage runs after every fetch has finished, so a writer had nothing to overlap.
+    """
+    file_save_counter = 0  # Counter for actual files saved, used for filename prefix
+
+    # Loop through all unique URLs found, in order so numbering stays stable
+    for idx, lesson in enumerate(lessons):
+        logger.info("Processing URL (%d/%d): %s", idx + 1, len(lessons), lesson.url)
+        if not lesson.fetched:
+            logger.warning("  Failed to fetch %s", lesson.url)
+        elif lesson.duplicate:
+            logger.info(
+                "  Skipping duplicate content for title: '%s' (from URL: %s)",
+                lesson.title,
+                lesson.url,
+            )
+        elif lesson.markdown is None:
+            logger.warning("  Could not scrape content from %s", lesson.url)
+        elif not lesson.markdown.strip():
+            logger.info(
+                "  Skipping empty or whitespace-only markdown for title: '%s' (from URL: %s)",
+                lesson.title,
+                lesson.url,
+            )
+        else:
+            file_save_counter += 1  # Increment counter for successfully saved unique file
+            filename_base = (
+                lesson.title
+                if lesson.title != "untitled_lesson"
+                else lesson.url.split("/")[-1] or lesson.url.split("/")[-2]
+            )
+            sanitized_filename_base = _SLUG_RE.sub("_", filename_base)
+
+            numbered_filename = f"{file_save_counter:03d}_{sanitized_filename_base}"
+            save_markdown(lesson.markdown, numbered_filename, output_dir)
+        logger.info("-" * 20)
+
+    return file_save_counter
+
+
+async def scrape_all(urls, output_dir, max_per_host=DEFAULT_MAX_PER_HOST, rate=0):
+    """
+    Runs every lesson through the fetch, title, convert and save stages in turn,
+    returning the number of lessons saved. Each stage handles the whole batch,
+    so it can be parallelized on its own terms.
+    max_per_host and rate (requests per second, 0 for no limit) bound fetches per host.
+    """
+    lessons = [Lesson(url) for url in urls]
+    await fetch_lessons(lessons, max_per_host, rate)
+    mark_duplicate_lessons(lessons)
+    convert_lessons(lessons)  # Nothing else runs during this stage; the pool does the work
+    return save_lessons(lessons, output_dir)
+
+
+def canonicalize_url(url):
+    """
+    Normalizes a URL so variants of the same page compare equal: lowercases the
+    scheme and host, drops the fragment and any trailing slash, and sorts the query.
+    """
+    parsed = urlparse(url)
+    path = parsed.path.rstrip("/") if parsed.path != "/" else parsed.path
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        path=path,
+        query=query,
+        fragment="",
+    ).geturl()
+
+
+class DocsFilter:
+    """
+    Decides which canonicalized URLs belong to the documentation set.
+    The docs base URL is derived and normalized once from the starting page, so
+    the per-link check is just a prefix test and two comparisons.
+    """
+
+    __slots__ = ("base", "netloc", "start_url")
+
+    def __init__(self, base, start_url):
+        self.base = base  # e.g. https://reactnative.dev/docs/
+        self.netloc = urlparse(base).netloc
+        self.start_url = canonicalize_url(start_url)
+
+    @classmethod
+    def from_start_url(cls, start_url):
+        """
+        Derives the docs base URL from the starting page (e.g., https://reactnative.dev/docs/).
+        This assumes the docs are in a path like /docs/, /guides/, etc.
+        For reactnative.dev/docs/getting-started, the base becomes https://reactnative.dev/docs/
+        """
+        parsed = urlparse(start_url)
+        path_segments = parsed.path.strip("/").split("/")
+        if len(path_segments) > 1:  # e.g., 'docs', 'getting-started'
+            base_path = "/".join(path_segments[:-1]) + "/"
+        else:  # e.g. just 'docs' or if it's the root
+            base_path = path_segments[0] + "/" if path_segments else ""
+        # Scheme and host are lowercased to match the canonicalized lesson links
+        base = f"{parsed.scheme.lower()}://{parsed.netloc.lower()}/{base_path.lstrip('/')}"
+        return cls(base, start_url)
+
+    def accept(self, url):
+        """True for a canonicalized URL inside the docs that is not the base or the starting page."""
+        return url.startswith(self.base) and url != self.base and url != self.start_url
+
+
+def extract_lesson_links(root, current_page_url, docs_filter):
+    """
+    Extracts lesson links from the lxml tree of the main documentation page.
+    Uses current_page_url to resolve relative links and docs_filter (a DocsFilter) to filter.
+    Every anchor is resolved once, in a single pass over the page, and returned
+    as (sidebar_links, page_wide_links): the links found inside the docs sidebar
+    and all matching links on the page.
+    """
+    sidebar_div_xpath, sidebar_nav_xpath, anchor_xpath = get_link_xpaths()
+    sidebar_links = []
+    seen_sidebar_links = set()  # Membership checks; sidebar_links keeps the order
+    page_wide_links = []
     # Try a broader selector for the sidebar container first
-    nav_element = soup.find("div", class_="sidebar_CUen")
+    nav_elements = sidebar_div_xpath(root)
 
-    if not nav_element:
+    if not nav_elements:
         # Fallback to the more specific nav element if the broader one isn't found
-        print("Could not find sidebar_CUen div, trying specific nav element...")
-        nav_element = soup.find("nav", attrs={"aria-label": "Docs sidebar"})
-
-    if nav_element:
-        for link_tag in nav_element.find_all("a", href=True):
-            href = link_tag["href"]
-            # Resolve the href to an absolute URL based on the current page's URL
-            full_url = urljoin(current_page_url, href)
-            # Remove any URL fragment
-            full_url = urlparse(full_url)._replace(fragment="").geturl()
-
-            # Add to links if it's within the docs_base_url, not already present, and not the base itself
-            if (
-                full_url.startswith(docs_base_url)
-                and full_url not in links
-                and full_url != docs_base_url
-                and full_url != current_page_url
-            ):
-                links.append(full_url)
+        logger.info("Could not find sidebar_CUen div, trying specific nav element...")
+        nav_elements = sidebar_nav_xpath(root)
+
+    if nav_elements:
+        # Only the sidebar subtree is queried here; its anchors are recognised by identity below
+        sidebar_anchors = set(anchor_xpath(nav_elements[0]))
     else:
         # This message now means neither the broad div nor the specific nav was found.
-        print(
-            f"Could not find the primary navigation element on {current_page_url}. Searched for 'div.sidebar_CUen' and 'nav[aria-label=\"Docs sidebar\"]'."
+        logger.warning(
+            "Could not find the primary navigation element on %s. Searched for 'div.sidebar_CUen' and 'nav[aria-label=\"Docs sidebar\"]'.",
+            current_page_url,
         )
-    return links
+        sidebar_anchors = set()
+
+    docs_netloc = docs_filter.netloc
+    for link_tag in anchor_xpath(root):
+        href = link_tag.get("href")
+        # Cheap string checks first, so urljoin/urlparse only run on plausible links
+        if not href or href[0] == "#" or href.startswith(_NON_PAGE_HREF_PREFIXES):
+            continue
+        if href.startswith(_ABSOLUTE_HREF_PREFIXES) and docs_netloc not in href.lower():
+            continue  # Absolute link to another host
+        # Resolve the href to an absolute URL based on the current page's URL
+        full_url = urljoin(current_page_url, href)
+        # Canonicalize so /foo, /foo/ and /foo#bar are only fetched once
+        full_url = canonicalize_url(full_url)
+
+        # Keep links within the docs that are not the base or the starting page itself
+        if not docs_filter.accept(full_url):
+            continue
+
+        page_wide_links.append(full_url)
+        if link_tag in sidebar_anchors and full_url not in seen_sidebar_links:
+            seen_sidebar_links.add(full_url)
+            sidebar_links.append(full_url)
+    return sidebar_links, page_wide_links
 
 
 def scrape_lesson_content(soup):
     """
     Extracts the main content of a lesson page.
+    Returns the content element itself, so it can be converted without re-parsing.
     This function will also likely need customization.
     """
     # Example: Find the main content area of the page
     # You'll need to inspect a lesson page on reactnative.dev/docs
     content_element = soup.find("article")  # This is a common tag for main content
-    if content_element:
-        return str(content_element)
+    if content_element is not None:
+        return content_element
     else:
-        print("Could not find the main content element. Please check the selector.")
+        logger.warning(
+            "Could not find the main content element. Please check the selector."
+        )
         return None
 
 
-def convert_to_markdown(html_content):
-    """Converts HTML content to Markdown."""
-    if html_content:
-        return html2markdown.convert(html_content)
+def convert_to_markdown(content_element):
+    """
+    Converts an already-parsed content element to Markdown.
+    convert_soup walks the existing tree; convert(str) would parse the HTML again.
+    """
+    if content_element is not None:
+        markdown = get_markdown_converter().convert_soup(content_element)
+        # markdownify only strips document-level newlines for a BeautifulSoup root,
+        # not a Tag, so match what convert(str) produced
+        return markdown.strip("\n")
     return ""
 
 
 def save_markdown(markdown_content, filename, output_dir="output_lessons"):
-    """Saves the Markdown content to a file."""
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
+    """
+    Saves the Markdown content to a file. output_dir must already exist.
+    Called inline from the save stage, where no other task is waiting on the loop.
+    """
     # Sanitize filename
-    sanitized_filename = re.sub(r'[\/*?:"<>|]', "", filename)
+    sanitized_filename = _FILENAME_STRIP_RE.sub("", filename)
     # Ensure it ends with .md
     if not sanitized_filename.endswith(".md"):
         sanitized_filename += ".md"
 
     filepath = os.path.join(output_dir, sanitized_filename)
+    # Encode once and write the bytes straight to the fd, skipping the TextIOWrapper
+    data = memoryview(markdown_content.encode("utf-8"))
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
-        print(f"Saved: {filepath}")
-    except IOError as e:
-        print(f"Error saving {filepath}: {e}")
-
-
-def get_lesson_title(soup, url):
-    """Extracts a title from the page, or derives it from the URL."""
-    if soup and soup.title and soup.title.string:
-        return soup.title.string.strip()
+        fd = os.open(filepath, _WRITE_FLAGS, 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data) :]
+        finally:
+            os.close(fd)
+        logger.info("Saved: %s", filepath)
+    except OSError as e:
+        logger.error("Error saving %s: %s", filepath, e)
+
+
+def get_lesson_title(content, url):
+    """
+    Extracts a title from the page's raw HTML bytes, or derives it from the URL.
+    Only the start of the document is searched, so no parse is needed.
+    """
+    match = _TITLE_RE.search(content, 0, TITLE_SEARCH_BYTES)
+    if match:
+        title = html.unescape(match.group(1).decode("utf-8", "replace")).strip()
+        if title:
+            return title
     # Fallback to deriving from URL if title is not found
     try:
         # Get the last part of the URL path
@@ -115,6 +673,19 @@ def get_lesson_title(soup, url):
         return "untitled_lesson"  # Default if all else fails
 
 
+def convert_and_extract(content):
+    """
+    Parses a fetched lesson page and converts its main content to Markdown,
+    returning None if no content element was found.
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    soup = make_soup(content, parse_only=get_lesson_strainer())
+    content_element = scrape_lesson_content(soup)
+    if content_element is None:
+        return None
+    return convert_to_markdown(content_element)
+
+
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(
@@ -130,140 +701,102 @@ def main():
         default="output_lessons",
         help="Directory to save markdown files (default: output_lessons)",
     )
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=DEFAULT_MAX_PER_HOST,
+        help=f"Maximum concurrent requests to one host (default: {DEFAULT_MAX_PER_HOST})",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="Maximum requests per second to one host (default: 0, no limit)",
+    )
 
     args = parser.parse_args()
     main_page_url = args.url
     output_dir = args.output
+    if args.max_per_host < 1:
+        parser.error("--max-per-host must be at least 1")
+    if args.rate < 0:
+        parser.error("--rate cannot be negative")
 
-    # Derive docs_base_url (e.g., https://reactnative.dev/docs/)
-    # This assumes the docs are in a path like /docs/, /guides/, etc.
-    # For reactnative.dev/docs/getting-started, docs_base_url becomes https://reactnative.dev/docs/
-    parsed_main_url = urlparse(main_page_url)
-    path_segments = parsed_main_url.path.strip("/").split("/")
-    if len(path_segments) > 1:  # e.g., 'docs', 'getting-started'
-        docs_base_path = "/".join(path_segments[:-1]) + "/"
-    else:  # e.g. just 'docs' or if it's the root
-        docs_base_path = path_segments[0] + "/" if path_segments else ""
+    docs_filter = DocsFilter.from_start_url(main_page_url)
 
-    docs_base_url = f"{parsed_main_url.scheme}://{parsed_main_url.netloc}/{docs_base_path.lstrip('/')}"
+    logger.info("Starting scrape with initial page: %s", main_page_url)
+    logger.info("Derived documentation base URL: %s", docs_filter.base)
 
-    print(f"Starting scrape with initial page: {main_page_url}")
-    print(f"Derived documentation base URL: {docs_base_url}")
+    main_root = fetch_tree(main_page_url)
 
-    main_soup = fetch_url(main_page_url)
-
-    if not main_soup:
-        print(
-            f"Could not fetch the initial documentation page: {main_page_url}. Exiting."
+    if main_root is None:
+        logger.error(
+            "Could not fetch the initial documentation page: %s. Exiting.", main_page_url
         )
         return
 
-    all_found_links = []
+    # Links from the sidebar and from the whole page are collected in one pass
+    logger.info("Extracting links from known sidebar selectors and the entire page...")
+    sidebar_links, page_wide_links = extract_lesson_links(
+        main_root, main_page_url, docs_filter
+    )
 
-    # 1. Attempt targeted extraction from sidebar
-    print("Attempting to extract links from known sidebar selectors...")
-    sidebar_links = extract_lesson_links(main_soup, main_page_url, docs_base_url)
+    # 1. Targeted extraction from sidebar
     if sidebar_links:
-        print(f"Found {len(sidebar_links)} links using sidebar selectors.")
-        all_found_links.extend(sidebar_links)
+        logger.info("Found %d links using sidebar selectors.", len(sidebar_links))
     else:
-        print(
-            f"No links found using specific sidebar selectors (tried 'div.sidebar_CUen' and 'nav[aria-label='Docs sidebar']')."
+        logger.info(
+            "No links found using specific sidebar selectors (tried 'div.sidebar_CUen' and 'nav[aria-label='Docs sidebar']')."
         )
 
-    # 2. Always perform a broader search on the entire page for robustness
-    print("Performing a broader search for links on the entire page...")
-    page_wide_links = []
-    for link_tag in main_soup.find_all("a", href=True):
-        href = link_tag["href"]
-        full_url = urljoin(main_page_url, href)
-        full_url = urlparse(full_url)._replace(fragment="").geturl()
-
-        if (
-            full_url.startswith(docs_base_url)
-            and full_url != main_page_url
-            and full_url != docs_base_url
-        ):
-            page_wide_links.append(full_url)
-
+    # 2. Broader search on the entire page for robustness
     if page_wide_links:
-        print(f"Found {len(page_wide_links)} links with page-wide search.")
-        all_found_links.extend(page_wide_links)
+        logger.info("Found %d links with page-wide search.", len(page_wide_links))
     else:
-        print(f"No additional links found with page-wide search on {main_page_url}.")
+        logger.info(
+            "No additional links found with page-wide search on %s.", main_page_url
+        )
 
-    # Deduplicate all collected links
+    # Deduplicate all collected links straight into a set
+    all_found_links = set(sidebar_links)
+    all_found_links.update(page_wide_links)
     if not all_found_links:
-        print(
-            f"No lesson links found on {main_page_url} that match the criteria (within {docs_base_url})."
+        logger.warning(
+            "No lesson links found on %s that match the criteria (within %s).",
+            main_page_url,
+            docs_filter.base,
         )
-        print(
+        logger.warning(
             "Please check the website structure and ensure the starting URL is correct and contains links to other documentation pages."
         )
         return
 
-    lesson_links = sorted(
-        list(set(all_found_links))
-    )  # Sort for consistent order before numbering
+    lesson_links = sorted(all_found_links)  # Sort for consistent order before numbering
 
-    print(
-        f"Found {len(lesson_links)} unique lesson links to process after combining all methods."
+    logger.info(
+        "Found %d unique lesson links to process after combining all methods.",
+        len(lesson_links),
     )
     if lesson_links:
-        print(f"Sample links: {lesson_links[:min(5, len(lesson_links))]}")
+        logger.info("Sample links: %s", lesson_links[: min(5, len(lesson_links))])
 
-    saved_page_titles = set()  # To track titles of already saved pages
-    file_save_counter = 0  # Counter for actual files saved, used for filename prefix
+    # Create the output directory once instead of checking it for every file
+    os.makedirs(output_dir, exist_ok=True)
 
-    # Loop through all unique URLs found
-    for idx, lesson_url in enumerate(lesson_links):
-        print(f"Processing URL ({idx + 1}/{len(lesson_links)}): {lesson_url}")
-        lesson_soup = fetch_url(lesson_url)
-        if lesson_soup:
-            lesson_title = get_lesson_title(lesson_soup, lesson_url)
-            # print(f"  Extracted Title: {lesson_title}") # Optional: for debugging title extraction
-
-            html_content = scrape_lesson_content(lesson_soup)
-            if html_content:
-                # Check if we've already saved a page with this exact title
-                if lesson_title in saved_page_titles:
-                    print(
-                        f"  Skipping duplicate content for title: '{lesson_title}' (from URL: {lesson_url})"
-                    )
-                else:
-                    markdown_content = convert_to_markdown(html_content)
-                    if not markdown_content or not markdown_content.strip():
-                        print(
-                            f"  Skipping empty or whitespace-only markdown for title: '{lesson_title}' (from URL: {lesson_url})"
-                        )
-                    else:
-                        file_save_counter += (
-                            1  # Increment counter for successfully saved unique file
-                        )
-                        filename_base = (
-                            lesson_title
-                            if lesson_title != "untitled_lesson"
-                            else lesson_url.split("/")[-1] or lesson_url.split("/")[-2]
-                        )
-                        sanitized_filename_base = re.sub(
-                            r"[^a-zA-Z0-9_-]", "_", filename_base
-                        )
-
-                        numbered_filename = (
-                            f"{file_save_counter:03d}_{sanitized_filename_base}"
-                        )
-                        save_markdown(markdown_content, numbered_filename, output_dir)
-                        saved_page_titles.add(
-                            lesson_title
-                        )  # Add title to set after successful save
-            else:
-                print(f"  Could not scrape content from {lesson_url}")
-        else:
-            print(f"  Failed to fetch {lesson_url}")
-        print("-" * 20)
+    logger.info(
+        "Fetching %d lessons with up to %d concurrent requests per host and converting them on %s workers...",
+        len(lesson_links),
+        args.max_per_host,
+        os.cpu_count(),
+    )
+    file_save_counter = asyncio.run(
+        scrape_all(lesson_links, output_dir, args.max_per_host, args.rate)
+    )
 
-    print(
-        f"Scraping complete. {file_save_counter} unique lessons saved. Markdown files are in the '{output_dir}' directory."
+    logger.info(
+        "Scraping complete. %d unique lessons saved. Markdown files are in the '%s' directory.",
+        file_save_counter,
+        output_dir,
     )
 
 